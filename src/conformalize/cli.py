@@ -7,7 +7,6 @@ from click import command
 from rich.pretty import pretty_repr
 from typed_settings import click_options
 from utilities.click import CONTEXT_SETTINGS
-from utilities.inflect import counted_noun
 from utilities.logging import basic_config
 from utilities.os import is_pytest
 from utilities.text import repr_str, strip_and_dedent
@@ -180,6 +179,8 @@ def _main(settings: Settings, /) -> None:
     if settings.run_version_bump:
         run_bump_my_version(modifications=modifications)
     if len(modifications) >= 1:
+        from utilities.inflect import counted_noun
+
         LOGGER.info(
             "Exiting due to %s: %s",
             counted_noun(modifications, "modification"),
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 from pathlib import Path
-from re import search
 
 from ruamel.yaml import YAML
 from utilities.pathlib import get_repo_root
@@ -24,7 +23,7 @@ RUFF_TOML = Path("ruff.toml")
 YAML_INSTANCE = YAML()
 
 
-RUN_VERSION_BUMP = (search("template", str(REPO_ROOT)) is None) and not IS_CI
+RUN_VERSION_BUMP = ("template" not in str(REPO_ROOT)) and not IS_CI
 
 
 __all__ = [
@@ -1,33 +1,32 @@
 from __future__ import annotations
 
 import json
+import re
+import tomllib
 from contextlib import contextmanager, suppress
+from copy import deepcopy
 from io import StringIO
-from itertools import product
 from pathlib import Path
-from re import MULTILINE, escape, sub
 from shlex import join
 from string import Template
 from subprocess import CalledProcessError
+from time import time
 from typing import TYPE_CHECKING, Any, Literal, assert_never
 
 import tomlkit
 from rich.pretty import pretty_repr
 from ruamel.yaml.scalarstring import LiteralScalarString
 from tomlkit import TOMLDocument, aot, array, document, table
-from tomlkit.exceptions import NonExistentKey
 from tomlkit.items import AoT, Array, Table
 from utilities.atomicwrites import writer
 from utilities.functions import ensure_class
 from utilities.iterables import OneEmptyError, OneNonUniqueError, one
-from utilities.pathlib import get_repo_root
 from utilities.re import extract_groups
 from utilities.subprocess import append_text, ripgrep, run
 from utilities.tempfile import TemporaryFile
 from utilities.text import strip_and_dedent
 from utilities.version import ParseVersionError, Version, parse_version
-from utilities.whenever import HOUR, get_now
-from whenever import ZonedDateTime
+from utilities.whenever import HOUR
 from xdg_base_dirs import xdg_cache_home
 
 from conformalize.constants import (
@@ -42,6 +41,7 @@ from conformalize.constants import (
     PYRIGHTCONFIG_JSON,
     PYTEST_TOML,
     README_MD,
+    REPO_ROOT,
     RUFF_TOML,
     YAML_INSTANCE,
 )
@@ -49,13 +49,57 @@ from conformalize.logging import LOGGER
 from conformalize.settings import SETTINGS
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, Iterable, Iterator, MutableSet
+    from collections.abc import Callable, Container, Iterable, Iterator, MutableSet
 
     from utilities.types import PathLike
 
     from conformalize.types import HasAppend, HasSetDefault, StrDict
 
 
+_ACTION_VERSIONS = {
+    "actions/checkout": "v6",
+    "actions/setup-python": "v6",
+    "astral-sh/ruff-action": "v3",
+    "astral-sh/setup-uv": "v7",
+}
+_ACTION_VERSIONS_PATTERN = re.compile(
+    rf"^(\s*- uses: ({'|'.join(map(re.escape, _ACTION_VERSIONS))}))@.+$",
+    flags=re.MULTILINE,
+)
+_BUMPVERSION_INIT_TEMPLATE = Template('__version__ = "${version}"')
+_BUMPVERSION_PYPROJECT_TEMPLATE = Template('version = "${version}"')
+_LOADS_CACHE: dict[tuple[Path, Callable[[str], Any]], tuple[str, Any]] = {}
+_PYRIGHTCONFIG_JSON_DEFAULTS: StrDict = {
+    "deprecateTypingAliases": True,
+    "enableReachabilityAnalysis": False,
+    "reportCallInDefaultInitializer": True,
+    "reportImplicitOverride": True,
+    "reportImplicitStringConcatenation": True,
+    "reportImportCycles": True,
+    "reportMissingSuperCall": True,
+    "reportMissingTypeArgument": False,
+    "reportMissingTypeStubs": False,
+    "reportPrivateImportUsage": False,
+    "reportPrivateUsage": False,
+    "reportPropertyTypeMismatch": True,
+    "reportUninitializedInstanceVariable": True,
+    "reportUnknownArgumentType": False,
+    "reportUnknownMemberType": False,
+    "reportUnknownParameterType": False,
+    "reportUnknownVariableType": False,
+    "reportUnnecessaryComparison": False,
+    "reportUnnecessaryTypeIgnoreComment": True,
+    "reportUnusedCallResult": True,
+    "reportUnusedImport": False,
+    "reportUnusedVariable": False,
+    "typeCheckingMode": "strict",
+}
+_PYTHON_VERSION_PATTERN = re.compile(r"^(\d+)\.(\d+)$")
+_REQUIRES_PYTHON_PATTERN = re.compile(
+    r'# requires-python = ">=\d+\.\d+"', flags=re.MULTILINE
+)
+
+
 def add_bumpversion_toml(
     *,
     modifications: MutableSet[Path] | None = None,
@@ -69,7 +113,9 @@ def add_bumpversion_toml(
             files = get_aot(bumpversion, "files")
             ensure_aot_contains(
                 files,
-                _add_bumpversion_toml_file(PYPROJECT_TOML, 'version = "${version}"'),
+                _add_bumpversion_toml_file(
+                    PYPROJECT_TOML, _BUMPVERSION_PYPROJECT_TEMPLATE
+                ),
             )
         if python_package_name_use is not None:
             files = get_aot(bumpversion, "files")
@@ -77,16 +123,16 @@ def add_bumpversion_toml(
                 files,
                 _add_bumpversion_toml_file(
                     f"src/{python_package_name_use}/__init__.py",
-                    '__version__ = "${version}"',
+                    _BUMPVERSION_INIT_TEMPLATE,
                 ),
             )
 
 
-def _add_bumpversion_toml_file(path: PathLike, template: str, /) -> Table:
+def _add_bumpversion_toml_file(path: PathLike, template: Template, /) -> Table:
     tab = table()
     tab["filename"] = str(path)
-    tab["search"] = Template(template).substitute(version="{current_version}")
-    tab["replace"] = Template(template).substitute(version="{new_version}")
+    tab["search"] = template.substitute(version="{current_version}")
+    tab["replace"] = template.substitute(version="{new_version}")
     return tab
 
 
@@ -125,13 +171,15 @@ def add_envrc(
             #!/usr/bin/env sh
             # shellcheck source=/dev/null
         """)
-        append_text(temp, shebang, skip_if_present=True, flags=MULTILINE, blank_lines=2)
+        append_text(
+            temp, shebang, skip_if_present=True, flags=re.MULTILINE, blank_lines=2
+        )
 
         echo = strip_and_dedent("""
             # echo
             echo_date() { echo "[$(date +'%Y-%m-%d %H:%M:%S')] $*" >&2; }
         """)
-        append_text(temp, echo, skip_if_present=True, flags=MULTILINE, blank_lines=2)
+        append_text(temp, echo, skip_if_present=True, flags=re.MULTILINE, blank_lines=2)
 
         if uv:
             append_text(
@@ -142,7 +190,7 @@ def add_envrc(
                     script=script,
                 ),
                 skip_if_present=True,
-                flags=MULTILINE,
+                flags=re.MULTILINE,
                 blank_lines=2,
             )
 
@@ -377,7 +425,6 @@ def add_pre_commit_config_yaml(
         _add_pre_commit_config_repo(
             dict_, pre_com_url, "pretty-format-json", args=("add", ["--autofix"])
         )
-        _add_pre_commit_config_repo(dict_, pre_com_url, "no-commit-to-branch")
         _add_pre_commit_config_repo(dict_, pre_com_url, "trailing-whitespace")
         if dockerfmt:
             _add_pre_commit_config_repo(
@@ -435,7 +482,7 @@ def add_pre_commit_config_yaml(
                 dict_,
                 "https://github.com/astral-sh/uv-pre-commit",
                 "uv-lock",
-                files=None if script is None else rf"^{escape(script)}$",
+                files=None if script is None else rf"^{re.escape(script)}$",
                 args=(
                     "add",
                     ["--upgrade", "--resolution", "highest", "--prerelease", "disallow"]
@@ -548,31 +595,9 @@ def add_pyrightconfig_json(
     script: str | None = SETTINGS.script,
 ) -> None:
     with yield_json_dict(PYRIGHTCONFIG_JSON, modifications=modifications) as dict_:
-        dict_["deprecateTypingAliases"] = True
-        dict_["enableReachabilityAnalysis"] = False
+        dict_.update(_PYRIGHTCONFIG_JSON_DEFAULTS)
         dict_["include"] = ["src" if script is None else script]
         dict_["pythonVersion"] = python_version
-        dict_["reportCallInDefaultInitializer"] = True
-        dict_["reportImplicitOverride"] = True
-        dict_["reportImplicitStringConcatenation"] = True
-        dict_["reportImportCycles"] = True
-        dict_["reportMissingSuperCall"] = True
-        dict_["reportMissingTypeArgument"] = False
-        dict_["reportMissingTypeStubs"] = False
-        dict_["reportPrivateImportUsage"] = False
-        dict_["reportPrivateUsage"] = False
-        dict_["reportPropertyTypeMismatch"] = True
-        dict_["reportUninitializedInstanceVariable"] = True
-        dict_["reportUnknownArgumentType"] = False
-        dict_["reportUnknownMemberType"] = False
-        dict_["reportUnknownParameterType"] = False
-        dict_["reportUnknownVariableType"] = False
-        dict_["reportUnnecessaryComparison"] = False
-        dict_["reportUnnecessaryTypeIgnoreComment"] = True
-        dict_["reportUnusedCallResult"] = True
-        dict_["reportUnusedImport"] = False
-        dict_["reportUnusedVariable"] = False
-        dict_["typeCheckingMode"] = "strict"
 
 
 ##
@@ -781,9 +806,18 @@ def ensure_contains(array: HasAppend, /, *objs: Any) -> None:
     if isinstance(array, AoT):
         msg = f"Use {ensure_aot_contains.__name__!r} instead of {ensure_contains.__name__!r}"
         raise TypeError(msg)
-    for obj in objs:
-        if obj not in array:
-            array.append(obj)
+    try:
+        existing = set(array)
+        _ = set(objs)
+    except TypeError:  # unhashable, e.g. dicts
+        for obj in objs:
+            if obj not in array:
+                array.append(obj)
+    else:
+        for obj in objs:
+            if obj not in existing:
+                array.append(obj)
+                existing.add(obj)
 
 
 def ensure_contains_partial(
@@ -798,36 +832,48 @@ def ensure_contains_partial(
 
 
 def ensure_not_contains(array: Array, /, *objs: Any) -> None:
-    for obj in objs:
-        try:
-            index = next(i for i, o in enumerate(array) if o == obj)
-        except StopIteration:
-            pass
-        else:
-            del array[index]
+    targets: Container[Any]
+    try:
+        targets = set(objs)
+        _ = set(array)
+    except TypeError:  # unhashable, e.g. dicts
+        targets = objs
+    indices = [i for i, o in enumerate(array) if o in targets]
+    for index in reversed(indices):
+        del array[index]
 
 
 ##
 
 
 def get_aot(container: HasSetDefault, key: str, /) -> AoT:
-    return ensure_class(container.setdefault(key, aot()), AoT)
+    return ensure_class(_get_or_set_default(container, key, aot), AoT)
 
 
 def get_array(container: HasSetDefault, key: str, /) -> Array:
-    return ensure_class(container.setdefault(key, array()), Array)
+    return ensure_class(_get_or_set_default(container, key, array), Array)
 
 
 def get_dict(container: HasSetDefault, key: str, /) -> StrDict:
-    return ensure_class(container.setdefault(key, {}), dict)
+    return ensure_class(_get_or_set_default(container, key, dict), dict)
 
 
 def get_list(container: HasSetDefault, key: str, /) -> list[Any]:
-    return ensure_class(container.setdefault(key, []), list)
+    return ensure_class(_get_or_set_default(container, key, list), list)
 
 
 def get_table(container: HasSetDefault, key: str, /) -> Table:
-    return ensure_class(container.setdefault(key, table()), Table)
+    return ensure_class(_get_or_set_default(container, key, table), Table)
+
+
+def _get_or_set_default(
+    container: HasSetDefault, key: str, default: Callable[[], Any], /
+) -> Any:
+    try:
+        return container[key]
+    except KeyError:
+        container[key] = default()
+        return container[key]
 
 
 ##
@@ -860,18 +906,18 @@ def get_partial_dict(
 def is_partial_dict(obj: Any, dict_: StrDict, /) -> bool:
     if not isinstance(obj, dict):
         return False
-    results: dict[str, bool] = {}
     for key, obj_value in obj.items():
         try:
             dict_value = dict_[key]
         except KeyError:
-            results[key] = False
+            return False
+        if isinstance(obj_value, dict) and isinstance(dict_value, dict):
+            is_equal = is_partial_dict(obj_value, dict_value)
         else:
-            if isinstance(obj_value, dict) and isinstance(dict_value, dict):
-                results[key] = is_partial_dict(obj_value, dict_value)
-            else:
-                results[key] = obj_value == dict_value
-    return all(results.values())
+            is_equal = obj_value == dict_value
+        if not is_equal:
+            return False
+    return True
 
 
 ##
@@ -886,7 +932,8 @@ def get_version_from_bumpversion_toml(
             bumpversion = get_table(tool, "bumpversion")
             return parse_version(str(bumpversion["current_version"]))
         case str() as text:
-            return get_version_from_bumpversion_toml(obj=tomlkit.parse(text))
+            bumpversion = tomllib.loads(text)["tool"]["bumpversion"]
+            return parse_version(str(bumpversion["current_version"]))
         case None:
             with yield_bumpversion_toml() as doc:
                 return get_version_from_bumpversion_toml(obj=doc)
@@ -1036,7 +1083,7 @@ def run_bump_my_version(*, modifications: MutableSet[Path] | None = None) -> Non
     except (CalledProcessError, ValueError):
         try:
             prev = get_version_from_git_show()
-        except (CalledProcessError, ParseVersionError, NonExistentKey):
+        except (CalledProcessError, ParseVersionError, KeyError):
             run_set_version(Version(0, 1, 0))
             return
     current = get_version_from_bumpversion_toml()
@@ -1049,25 +1096,24 @@ def run_bump_my_version(*, modifications: MutableSet[Path] | None = None) -> Non
 
 
 def run_pre_commit_update(*, modifications: MutableSet[Path] | None = None) -> None:
-    cache = xdg_cache_home() / "conformalize" / get_repo_root().name
+    cache = xdg_cache_home() / "conformalize" / REPO_ROOT.name
 
     def run_autoupdate() -> None:
         current = PRE_COMMIT_CONFIG_YAML.read_text()
         run("pre-commit", "autoupdate", print=True)
-        with writer(cache, overwrite=True) as temp:
-            _ = temp.write_text(get_now().format_iso())
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        cache.touch()
         if (modifications is not None) and (
             PRE_COMMIT_CONFIG_YAML.read_text() != current
         ):
             modifications.add(PRE_COMMIT_CONFIG_YAML)
 
     try:
-        text = cache.read_text()
+        mtime = cache.stat().st_mtime
     except FileNotFoundError:
         run_autoupdate()
     else:
-        prev = ZonedDateTime.parse_iso(text.rstrip("\n"))
-        if prev < (get_now() - 12 * HOUR):
+        if (time() - mtime) > (12 * HOUR).in_seconds():
             run_autoupdate()
 
 
@@ -1089,11 +1135,8 @@ def run_ripgrep_and_replace(
         return
     for path in map(Path, result.splitlines()):
         with yield_text_file(path, modifications=modifications) as temp:
-            text = sub(
-                r'# requires-python = ">=\d+\.\d+"',
-                rf'# requires-python = ">={version}"',
-                path.read_text(),
-                flags=MULTILINE,
+            text = _REQUIRES_PYTHON_PATTERN.sub(
+                f'# requires-python = ">={version}"', path.read_text()
             )
             _ = temp.write_text(text)
 
@@ -1118,7 +1161,7 @@ def update_action_file_extensions(
     *, modifications: MutableSet[Path] | None = None
 ) -> None:
     try:
-        paths = list(Path(".github").rglob("**/*.yml"))
+        paths = list(Path(".github").rglob("*.yml"))
     except FileNotFoundError:
         return
     for path in paths:
@@ -1134,25 +1177,18 @@ def update_action_file_extensions(
 
 def update_action_versions(*, modifications: MutableSet[Path] | None = None) -> None:
     try:
-        paths = list(Path(".github").rglob("**/*.yaml"))
+        paths = list(Path(".github").rglob("*.yaml"))
     except FileNotFoundError:
         return
-    versions = {
-        "actions/checkout": "v6",
-        "actions/setup-python": "v6",
-        "astral-sh/ruff-action": "v3",
-        "astral-sh/setup-uv": "v7",
-    }
-    for path, (action, version) in product(paths, versions.items()):
-        text = sub(
-            rf"^(\s*- uses: {action})@.+$",
-            rf"\1@{version}",
-            path.read_text(),
-            flags=MULTILINE,
+    for path in paths:
+        current = path.read_text()
+        text = _ACTION_VERSIONS_PATTERN.sub(
+            lambda m: f"{m[1]}@{_ACTION_VERSIONS[m[2]]}", current
         )
-        with yield_yaml_dict(path, modifications=modifications) as dict_:
-            dict_.clear()
-            dict_.update(YAML_INSTANCE.load(text))
+        if text == current:
+            continue
+        with yield_text_file(path, modifications=modifications) as temp:
+            _ = temp.write_text(text)
 
 
 ##
@@ -1167,10 +1203,20 @@ def write_text(
     modifications: MutableSet[Path] | None = None,
 ) -> None:
     src, dest = map(Path, [src, dest])
+    _write_text(verb, src.read_text(), dest, modifications=modifications)
+
+
+def _write_text(
+    verb: str,
+    text: str,
+    dest: Path,
+    /,
+    *,
+    modifications: MutableSet[Path] | None = None,
+) -> None:
     LOGGER.info("%s '%s'...", verb, dest)
-    text = src.read_text().rstrip("\n") + "\n"
     with writer(dest, overwrite=True) as temp:
-        _ = temp.write_text(text)
+        _ = temp.write_text(text.rstrip("\n") + "\n")
     if modifications is not None:
         modifications.add(dest)
 
@@ -1231,7 +1277,7 @@ def yield_python_versions(
 
 
 def _yield_python_version_tuple(version: str, /) -> tuple[int, int]:
-    major, minor = extract_groups(r"^(\d+)\.(\d+)$", version)
+    major, minor = extract_groups(_PYTHON_VERSION_PATTERN, version)
     return int(major), int(minor)
 
 
@@ -1285,9 +1331,8 @@ def yield_write_context[T](
     path = Path(path)
 
     def run_write(verb: str, data: T, /) -> None:
-        with writer(path, overwrite=True) as temp:
-            _ = temp.write_text(dumps(data))
-            write_text(verb, temp, path, modifications=modifications)
+        _write_text(verb, dumps(data), path, modifications=modifications)
+        _ = _LOADS_CACHE.pop((path, loads), None)
 
     try:
         current = path.read_text()
@@ -1295,13 +1340,28 @@ def yield_write_context[T](
         yield (default := get_default())
         run_write("Writing", default)
     else:
-        data = loads(current)
+        data, original = _loads_cached(path, current, loads)
         yield data
-        is_equal = data == loads(current)  # tomlkit cannot handle !=
+        is_equal = data == original  # tomlkit cannot handle !=
         if not is_equal:
             run_write("Modifying", data)
 
 
+def _loads_cached[T](
+    path: Path, text: str, loads: Callable[[str], T], /
+) -> tuple[T, T]:
+    try:
+        cached_text, original = _LOADS_CACHE[path, loads]
+    except KeyError:
+        pass
+    else:
+        if cached_text == text:
+            return deepcopy(original), original
+    data = loads(text)
+    _LOADS_CACHE[path, loads] = (text, original := deepcopy(data))
+    return data, original
+
+
 ##
 
 
@@ -2,18 +2,31 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any
 
-from pytest import mark, param, raises
+import tomlkit
+from pytest import MonkeyPatch, mark, param, raises
 from utilities.iterables import one
 from utilities.text import strip_and_dedent
+from utilities.version import Version
 
 from conformalize.lib import (
+    _LOADS_CACHE,
     _add_envrc_uv_text,
+    _loads_cached,
+    ensure_contains,
+    ensure_not_contains,
+    get_array,
     get_partial_dict,
+    get_version_from_bumpversion_toml,
     is_partial_dict,
+    update_action_versions,
+    yield_json_dict,
     yield_python_versions,
+    yield_toml_doc,
 )
 
 if TYPE_CHECKING:
+    from pathlib import Path
+
     from conformalize.types import StrDict
 
 
@@ -39,6 +52,42 @@ class TestAddEnvrcUvText:
         assert result == expected
 
 
+class TestEnsureContains:
+    @mark.parametrize(
+        ("array", "objs", "expected"),
+        [
+            param([], ["a"], ["a"]),
+            param(["a"], ["a"], ["a"]),
+            param(["a"], ["b", "a", "b"], ["a", "b"]),
+            param([{"a": 1}], [{"a": 1}, {"b": 2}], [{"a": 1}, {"b": 2}]),
+            param(["a"], [{"a": 1}, "a"], ["a", {"a": 1}]),
+        ],
+    )
+    def test_main(
+        self, *, array: list[Any], objs: list[Any], expected: list[Any]
+    ) -> None:
+        ensure_contains(array, *objs)
+        assert array == expected
+
+
+class TestEnsureNotContains:
+    @mark.parametrize(
+        ("text", "objs", "expected"),
+        [
+            param("[]", ["a"], []),
+            param('["a"]', ["a"], []),
+            param('["a", "b", "c"]', ["c", "a"], ["b"]),
+            param('["a", "b", "a"]', ["a"], ["b"]),
+            param('["a", "b"]', ["c"], ["a", "b"]),
+            param('[{a = 1}, "b"]', [{"a": 1}], ["b"]),
+        ],
+    )
+    def test_main(self, *, text: str, objs: list[Any], expected: list[Any]) -> None:
+        array = get_array(tomlkit.parse(f"array = {text}"), "array")
+        ensure_not_contains(array, *objs)
+        assert array == expected
+
+
 class TestGetPartialDict:
     def test_main(self) -> None:
         url = "https://github.com/owner/repo"
@@ -49,6 +98,21 @@ class TestGetPartialDict:
         assert result == one(repos_list)
 
 
+class TestGetVersionFromBumpversionToml:
+    def test_text(self) -> None:
+        text = strip_and_dedent("""
+            [tool.bumpversion]
+              allow_dirty = true
+              current_version = "1.2.3"
+        """)
+        result = get_version_from_bumpversion_toml(obj=text)
+        assert result == Version(1, 2, 3)
+
+    def test_text_missing_key(self) -> None:
+        with raises(KeyError):
+            _ = get_version_from_bumpversion_toml(obj="[tool]")
+
+
 class TestIsPartialDict:
     @mark.parametrize(
         ("obj", "dict_", "expected"),
@@ -74,6 +138,40 @@ class TestIsPartialDict:
         assert is_partial_dict(obj, dict_) is expected
 
 
+class TestUpdateActionVersions:
+    def test_main(self, *, monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+        monkeypatch.chdir(tmp_path)
+        path = tmp_path / ".github" / "workflows" / "workflow.yaml"
+        path.parent.mkdir(parents=True)
+        _ = path.write_text(
+            strip_and_dedent("""
+                jobs:
+                  job:
+                    steps:
+                      - uses: actions/checkout@v4
+                      - uses: astral-sh/setup-uv@v7
+            """)
+        )
+        modifications: set[Path] = set()
+        update_action_versions(modifications=modifications)
+        assert len(modifications) == 1
+        assert "actions/checkout@v6" in path.read_text()
+        modifications.clear()
+        update_action_versions(modifications=modifications)
+        assert modifications == set()
+
+
+class TestYieldJsonDict:
+    def test_write(self, *, tmp_path: Path) -> None:
+        path = tmp_path / "file.json"
+        _ = path.write_text('{"a": 1}\n')
+        modifications: set[Path] = set()
+        with yield_json_dict(path, modifications=modifications) as dict_:
+            dict_["a"] = 2
+        assert modifications == {path}
+        assert path.read_text() == '{"a": 2}\n'
+
+
 class TestYieldPythonVersions:
     @mark.parametrize(
         ("version", "expected"),
@@ -93,3 +191,54 @@ class TestYieldPythonVersions:
     def test_error_minor(self) -> None:
         with raises(ValueError, match="Minor version must be at most 14; got 15"):
             _ = list(yield_python_versions("3.15"))
+
+
+class TestYieldTomlDoc:
+    def test_reopen(self, *, tmp_path: Path) -> None:
+        path = tmp_path / "file.toml"
+        _ = path.write_text("a = 1\n")
+        modifications: set[Path] = set()
+        for _i in range(2):
+            with yield_toml_doc(path, modifications=modifications) as doc:
+                assert doc["a"] == 1
+        assert modifications == set()
+        with yield_toml_doc(path, modifications=modifications) as doc:
+            doc["a"] = 2
+        assert modifications == {path}
+        with yield_toml_doc(path) as doc:
+            assert doc["a"] == 2
+
+    def test_cache(self, *, tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+        path = tmp_path / "file.toml"
+        _ = path.write_text("a = 1\n")
+        calls: list[str] = []
+        parse = tomlkit.parse
+
+        def counting_parse(text: str, /) -> tomlkit.TOMLDocument:
+            calls.append(text)
+            return parse(text)
+
+        monkeypatch.setattr(tomlkit, "parse", counting_parse)
+        for _i in range(2):
+            with yield_toml_doc(path) as doc:
+                assert doc["a"] == 1
+        assert len(calls) == 1
+        with raises(RuntimeError), yield_toml_doc(path) as doc:
+            doc["a"] = 2
+            raise RuntimeError
+        with yield_toml_doc(path) as doc:
+            assert doc["a"] == 1
+        assert len(calls) == 1
+        with yield_toml_doc(path) as doc:
+            doc["a"] = 2
+        assert (path, counting_parse) not in _LOADS_CACHE
+        with yield_toml_doc(path) as doc:
+            assert doc["a"] == 2
+        assert len(calls) == 2
+
+    def test_cache_keyed_on_loads(self, *, tmp_path: Path) -> None:
+        path = tmp_path / "file.txt"
+        data, _ = _loads_cached(path, "1", int)
+        assert data == 1
+        data, _ = _loads_cached(path, "1", str)
+        assert data == "1"